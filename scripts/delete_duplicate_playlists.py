@@ -4,66 +4,11 @@ Delete duplicate KALX playlists from Spotify.
 Keeps the most recent playlist for each show name.
 """
 
-import os
 import sys
-import requests
-import json
-from collections import defaultdict
-from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
 
-def get_access_token():
-    """Get Spotify access token using refresh token."""
-    client_id = os.environ.get('SPOTIFY_CLIENT_ID')
-    client_secret = os.environ.get('SPOTIFY_CLIENT_SECRET')
-    refresh_token = os.environ.get('SPOTIFY_REFRESH_TOKEN')
-    
-    if not all([client_id, client_secret, refresh_token]):
-        print("❌ Missing environment variables:")
-        print("   SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_REFRESH_TOKEN")
-        sys.exit(1)
-    
-    # Get access token
-    import base64
-    auth_header = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
-    
-    response = requests.post('https://accounts.spotify.com/api/token', 
-        headers={'Authorization': f'Basic {auth_header}'},
-        data={
-            'grant_type': 'refresh_token',
-            'refresh_token': refresh_token
-        }
-    )
-    
-    if response.status_code != 200:
-        print(f"❌ Failed to get access token: {response.text}")
-        sys.exit(1)
-        
-    return response.json()['access_token']
-
-def get_user_playlists(access_token):
-    """Get all user playlists."""
-    headers = {'Authorization': f'Bearer {access_token}'}
-    playlists = []
-    url = 'https://api.spotify.com/v1/me/playlists?limit=50'
-    
-    while url:
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            print(f"❌ Failed to get playlists: {response.text}")
-            sys.exit(1)
-            
-        data = response.json()
-        playlists.extend(data['items'])
-        url = data.get('next')
-    
-    return playlists
-
-def delete_playlist(access_token, playlist_id):
-    """Delete a playlist (actually unfollows it)."""
-    headers = {'Authorization': f'Bearer {access_token}'}
-    response = requests.delete(f'https://api.spotify.com/v1/playlists/{playlist_id}/followers', 
-                              headers=headers)
-    return response.status_code == 200
+from spotify_common import delete_playlists, fetch_all_playlists, get_access_token
 
 def main():
     print("🎵 KALX Duplicate Playlist Cleaner")
@@ -75,7 +20,9 @@ def main():
     
     # Get all playlists
     print("📋 Fetching user playlists...")
-    all_playlists = get_user_playlists(access_token)
+    all_playlists = fetch_all_playlists(access_token)
+    if all_playlists is None:
+        sys.exit(1)
     
     # Find KALX playlists
     kalx_playlists = [p for p in all_playlists if p['name'].startswith('KALX -')]
@@ -85,20 +32,21 @@ def main():
         print("✅ No KALX playlists found!")
         return
     
-    # Group by name to find duplicates
-    playlist_groups = defaultdict(list)
-    for playlist in kalx_playlists:
-        playlist_groups[playlist['name']].append(playlist)
+    # Sort by name, most recent first within each name (sorts are stable), so
+    # duplicates end up adjacent and already in keep/delete order
+    kalx_playlists.sort(key=lambda p: p.get('snapshot_id', ''), reverse=True)
+    kalx_playlists.sort(key=itemgetter('name'))
     
     # Find duplicates
     duplicates_found = 0
+    unique_count = 0
     to_delete = []
     
-    for name, playlists in playlist_groups.items():
+    for name, group in groupby(kalx_playlists, key=itemgetter('name')):
+        playlists = list(group)
+        unique_count += 1
         if len(playlists) > 1:
             duplicates_found += len(playlists) - 1
-            # Sort by creation date (most recent first)
-            playlists.sort(key=lambda p: p.get('snapshot_id', ''), reverse=True)
             
             print(f"\n📂 '{name}' has {len(playlists)} duplicates:")
             for i, playlist in enumerate(playlists):
@@ -123,17 +71,13 @@ def main():
     
     # Delete duplicates
     print(f"\n🗑️  Deleting {len(to_delete)} duplicate playlists...")
-    deleted_count = 0
+    deleted_count, failed = delete_playlists(access_token, to_delete)
     
-    for playlist in to_delete:
-        if delete_playlist(access_token, playlist['id']):
-            print(f"   ✅ Deleted: {playlist['name']} ({playlist['tracks']['total']} tracks)")
-            deleted_count += 1
-        else:
-            print(f"   ❌ Failed to delete: {playlist['name']}")
+    for playlist in failed:
+        print(f"   ❌ Failed to delete: {playlist['name']}")
     
     print(f"\n✅ Successfully deleted {deleted_count} duplicate playlists!")
-    print(f"🎵 {len(playlist_groups)} unique KALX playlists remain")
+    print(f"🎵 {unique_count} unique KALX playlists remain")
 
 if __name__ == '__main__':
     try:
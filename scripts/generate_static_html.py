@@ -3,42 +3,249 @@
 Generate a standalone HTML page from the JSON playlist dump.
 """
 
-import json
 import sys
 import os
-from datetime import datetime, timezone
+import hashlib
+import time
 import random
+from collections import defaultdict
+from operator import itemgetter
+
+# orjson parses the playlist dump several times faster; fall back to stdlib json
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Where the rendered page is written, relative to the repo root
+OUTPUT_DIR = "docs"
+OUTPUT_PATH = os.path.join(OUTPUT_DIR, "index.html")
+
+# Escape table for text and quoted attribute values; str.translate does this in
+# one C-level pass instead of html.escape's chain of str.replace calls
+HTML_ESCAPE = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+)
+
+# One playlist card: a header bar with title + timestamp above the artist-masked
+# preview grid. Rendered with a single format() call per playlist.
+CARD_TEMPLATE = """<li><a class='card' href='{url}'>
+<div class="media-block">
+<div class='header-bar' style='background:{color}'>
+<div class='badge'>{track_count}</div>
+<div class='title'>{name}</div>
+<div class='timestamp'>Last Updated {last_updated}</div>
+</div>
+<div class='overlay-all'>
+<div class='mask-text'>{artists}</div>
+<div class="preview-grid">{images}
+</div>
+</div>
+</a></li>"""
+# bound once at import so each card is a single call with no attribute lookup
+render_card_template = CARD_TEMPLATE.format
+
+
+# Separators scattered between artist names in a card's mask text
+SYMBOLS = (
+    '◆', '◇', '•', '×', '/', '\\', '✦', '✧', '✵', '✶', '✹', '✺',
+    '✿', '❖', '❂', '❄', '❈', '❉', '❋', '◈', '▫', '▱',
+    '✢', '✣', '✤', '✥', '✦', '✧', '★', '☆', '☉', '☾', '☽'
+)
+
+# Card header colors; each playlist gets a fixed one based on its name
+PALETTE = (
+    '#896241ff',  # raw-umber
+    '#422A19ff',  # bistre
+    '#88B1D4ff',  # carolina-blue
+    '#A9C8D8ff',  # columbia-blue
+    '#5A7ACFff',  # glaucous
+)
+
+
+def name_color(name):
+    """Pick a stable palette color from the first 4 bytes of the name's MD5"""
+    digest = hashlib.md5(name.encode('utf-8')).digest()
+    return PALETTE[int.from_bytes(digest[:4], "big") % len(PALETTE)]
+
+
+# Static page prelude (styles and the TOC opener), emitted with one write
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Permanent+Marker&display=swap');
+@import url('https://fonts.googleapis.com/css2?family=Special+Gothic+Expanded+One:wght@400&display=swap');
+@import url('https://fonts.googleapis.com/css2?family=Libre+Bodoni:ital@1&display=swap');
+body { font-family: "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif; max-width: 100vw; margin: 0; padding: 1rem; background-color: #ffffff; background-image: url(bg.jpg); background-attachment: fixed; background-size: cover }
+a { color: inherit; text-decoration: none; }
+h2 { font-size: 1.25rem; margin-bottom: 0.5rem; }
+h3 { font-family: 'Permanent Marker', cursive; font-size: 1.5rem; margin: 0 0 0.5rem; }
+.station { margin-bottom: 2rem; }
+.playlist-list { list-style: none; margin: 0; padding: 0; }
+.playlist-list .card { display: block; max-width: 800px; text-decoration: none; color: inherit; transition: background-color 0.5s ease; }
+.card:hover { background-color: #000; }
+.card h3 { font-size: 2rem; margin: 0 0 0.5rem; text-align: center; }
+.meta { font-size: 0.9rem; color: #555555; margin: 0 0 0.5rem; text-align: center; }
+.media-block { position: relative; margin-bottom: 2rem; }
+.preview-grid { display: grid; grid-template-columns: repeat(4, 1fr); }
+.preview-grid img { width: 100%; height: auto; object-fit: cover; }
+.overlay-all { position: relative; overflow: hidden; }
+.playlist-name { position: absolute; z-index: 5; text-align: left; }
+.playlist-name > span { position: absolute; z-index: 10; background: #000; color: #fff; word-break: break-word; }
+.overlay-all .mask-text { position: absolute; inset: 0; padding: 0.5rem; font-family: 'Special Gothic Expanded One', sans-serif; font-weight: 400; font-size: 4.12rem; color: #000; text-transform: uppercase; text-align: justify; line-height: 0.9; word-break: break-all; transition: opacity 0.5s ease; }
+.card:hover .overlay-all .mask-text { opacity: 0 }
+.header-bar { position: relative; padding: 2rem; color: #fff; display: flex; flex-direction: column; justify-content: center; }
+.header-bar .title { font-family: 'Libre Bodoni', serif; font-style: italic; font-size: 28px; margin: 0; }
+.header-bar .timestamp { font-family: 'Libre Bodoni', serif; font-style: italic; font-size: 16px; margin: 0; }
+.media-block img { mix-blend-mode: lighten; }
+.badge { position: absolute; top: 4.5rem; right: -1.5rem; z-index: 10; background: #e63946; color: #fff; border-radius: 50%; width: 5rem; height: 5rem; display: flex; align-items: center; justify-content: center; font-size: 1.8rem; font-weight: bold; }
+.toc { position: fixed; top: 1rem; left: 1rem; max-width: 200px; }
+.toc strong { display: block; margin-bottom: 0.5rem; }
+.toc ul { list-style: none; padding: 0; margin: 0; }
+.toc li { margin-bottom: 0.5rem; }
+.main { margin-left: 220px; }
+@media (max-width: 768px) {
+  .toc { position: static; margin: 0 0 1rem; max-width: none; }
+  .main { margin-left: 0; }
+  .overlay-all .mask-text { font-size: 2.5rem; }
+  .badge { position: relative; top: auto; right: auto; margin-left: 0.5rem; }
+}
+.station h2 { margin-bottom: 0.25rem; }
+.station h2 + hr { margin: 0 auto 1rem; border: none; border-top: 1px solid #ccc; }
+.footer { text-align: center; margin-top: 2rem; font-size: 0.9rem; color: #555555; }
+</style></head><body>
+<div class='toc'><strong>Stations</strong><ul>"""
+
+
+def render_card(p):
+    """Render one playlist card, escaping its text fields"""
+    # one pass over the preview collects both the image tags and the unique
+    # artist names (dict keys keep first-seen order)
+    artists = {}
+    img_parts = []
+    for t in p.get("preview", [])[:12]:
+        get = t.get
+        artists.update(dict.fromkeys(get("artists", [])))
+        image_url = get("image_url")
+        if image_url:
+            img_parts.append(
+                f"\n<img src='{image_url.translate(HTML_ESCAPE)}'"
+                f" alt='{(get('name') or '').translate(HTML_ESCAPE)}'/>"
+            )
+    artist_set = list(artists)
+    # join artists with a random symbol between each name, drawing all the
+    # separators in one call
+    txt = ''
+    if artist_set:
+        seps = random.choices(SYMBOLS, k=len(artist_set) - 1)
+        txt = artist_set[0].translate(HTML_ESCAPE) + "".join(
+            f" {sep} {art.translate(HTML_ESCAPE)}"
+            for sep, art in zip(seps, artist_set[1:])
+        )
+    images = "".join(img_parts)
+    return render_card_template(
+        url=p["url"].translate(HTML_ESCAPE),
+        color=p["color"],
+        track_count=str(p.get("track_count", 0)).translate(HTML_ESCAPE),
+        name=p["name"].translate(HTML_ESCAPE),
+        last_updated=str(p["last_updated"]).translate(HTML_ESCAPE),
+        artists=txt,
+        images=images,
+    )
+
+
+def render_page(sections, ts, count):
+    """Yield the page line by line so it can be streamed straight to the output file
+
+    sections is a list of (escaped station name, playlists) pairs in page order.
+    """
+    yield HTML_HEAD
+    for esc, _ in sections:
+        yield f"<li><a href='#{esc}'>{esc}</a></li>"
+    yield "</ul></div>"
+    yield "<div class='main'>"
+
+    for esc, playlists in sections:
+        yield f'<div class="station" id="{esc}"><h2>{esc}</h2><hr/>'
+        yield '<ul class="playlist-list">'
+        # main() has already sorted these by last_updated, newest first
+        for p in playlists:
+            yield render_card(p)
+    yield "</ul></div>"
+
+    # close main content and add overall timestamp footer
+    yield "</div>"
+    yield f"<div class='footer'>Updated: {ts} · Total Playlists: {count}</div>"
+    yield "</body></html>"
+
+
+def parse_records(lines):
+    """Parse JSONL lines, assuming the scraper wrote them all cleanly"""
+    # happy path: wrap the lines into one JSON array and parse it in a single call.
+    # Only trusted when it yields exactly one object per line, since the joining
+    # commas could otherwise merge two broken lines or split one into several.
+    try:
+        records = json_loads(b"[" + b",".join(lines) + b"]")
+    except ValueError:
+        pass
+    else:
+        if len(records) == len(lines) and all(type(r) is dict for r in records):
+            return records
+    # slow path: find and report the bad lines, keeping everything else
+    records = []
+    for line in lines:
+        try:
+            record = json_loads(line)
+            if type(record) is not dict:
+                raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+            records.append(record)
+        # ValueError covers both parsers' decode errors, including bad UTF-8
+        except ValueError as e:
+            print(
+                f"⚠️  Warning: Failed to parse line: {line.rstrip().decode('utf-8', 'replace')}",
+                file=sys.stderr,
+            )
+            print(f"   Error: {e}", file=sys.stderr)
+    return records
+
+
+def utc_timestamp():
+    """Current UTC time as 'YYYY-MM-DD HH:MM UTC'"""
+    t = time.gmtime()
+    return "%04d-%02d-%02d %02d:%02d UTC" % (
+        t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min
+    )
 
 
 # Main processing: group JSONL (playlists.jsonl) into a JSON dump and produce HTML
 def main(infile):
-    stations = {}
+    stations = defaultdict(list)
     total_playlist_count = 0
-    with open(infile) as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                playlist = json.loads(line)
-                station = playlist.get("station")
-                if not station:
-                    continue
-                # skip empty playlists
-                track_count = playlist.get("track_count", 0) or 0
-                if track_count == 0:
-                    continue
-                entry = {
-                    "name": playlist.get("name"),
-                    "url": playlist.get("url"),
-                    "track_count": track_count,
-                    "last_updated": playlist.get("last_updated", ""),
-                    "preview": playlist.get("preview", []),
-                }
-                stations.setdefault(station, []).append(entry)
-                total_playlist_count += 1
-            except (json.JSONDecodeError, KeyError) as e:
-                print(f"⚠️  Warning: Failed to parse line: {line.rstrip()}", file=sys.stderr)
-                print(f"   Error: {e}", file=sys.stderr)
+    # one bulk read and a single C-level split instead of per-line file iteration
+    with open(infile, "rb") as f:
+        raw = f.read()
+    lines = [line for line in raw.split(b"\n") if line.strip()]
+    for playlist in parse_records(lines):
+        station = playlist.get("station")
+        if not station:
+            continue
+        # skip empty playlists
+        track_count = playlist.get("track_count", 0) or 0
+        if track_count == 0:
+            continue
+        name = playlist.get("name") or ""
+        entry = {
+            "name": name,
+            "url": playlist.get("url") or "",
+            "track_count": track_count,
+            # never missing, so it can be sorted on with itemgetter
+            "last_updated": playlist.get("last_updated") or "",
+            "preview": playlist.get("preview", []),
+            # resolved once here so rendering is a pure format step
+            "color": name_color(name),
+        }
+        stations[station].append(entry)
+        total_playlist_count += 1
     if not stations:
         print("❌ Error: No playlists found in input", file=sys.stderr)
         sys.exit(1)
@@ -46,7 +253,7 @@ def main(infile):
     # Build JSON data with timestamp, station grouping, and total count
     data = {
         "stations": stations,
-        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+        "timestamp": utc_timestamp(),
         "total_playlist_count": total_playlist_count,
     }
 
@@ -56,137 +263,34 @@ def main(infile):
     count = data["total_playlist_count"]
 
     # Sort playlists within each station by last_updated (newest first)
+    by_last_updated = itemgetter("last_updated")
     for stn, pls in stations.items():
-        pls.sort(key=lambda p: p.get("last_updated", ""), reverse=True)
-
-    html = [
-        "<!DOCTYPE html>",
-        '<html lang="en"><head><meta charset="utf-8">',
-        "<style>",
-        "@import url('https://fonts.googleapis.com/css2?family=Permanent+Marker&display=swap');",
-        "@import url('https://fonts.googleapis.com/css2?family=Special+Gothic+Expanded+One:wght@400&display=swap');",
-        "@import url('https://fonts.googleapis.com/css2?family=Libre+Bodoni:ital@1&display=swap');",
-        'body { font-family: "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif; max-width: 100vw; margin: 0; padding: 1rem; background-color: #ffffff; background-image: url(bg.jpg); background-attachment: fixed; background-size: cover }',
-        "a { color: inherit; text-decoration: none; }",
-        "h2 { font-size: 1.25rem; margin-bottom: 0.5rem; }",
-        "h3 { font-family: 'Permanent Marker', cursive; font-size: 1.5rem; margin: 0 0 0.5rem; }",
-        ".station { margin-bottom: 2rem; }",
-        ".playlist-list { list-style: none; margin: 0; padding: 0; }",
-        ".playlist-list .card { display: block; max-width: 800px; text-decoration: none; color: inherit; transition: background-color 0.5s ease; }",
-        ".card:hover { background-color: #000; }",
-        ".card h3 { font-size: 2rem; margin: 0 0 0.5rem; text-align: center; }",
-        ".meta { font-size: 0.9rem; color: #555555; margin: 0 0 0.5rem; text-align: center; }",
-        ".media-block { position: relative; margin-bottom: 2rem; }",
-        ".preview-grid { display: grid; grid-template-columns: repeat(4, 1fr); }",
-        ".preview-grid img { width: 100%; height: auto; object-fit: cover; }",
-        ".overlay-all { position: relative; overflow: hidden; }",
-        ".playlist-name { position: absolute; z-index: 5; text-align: left; }",
-        ".playlist-name > span { position: absolute; z-index: 10; background: #000; color: #fff; word-break: break-word; }",
-        ".overlay-all .mask-text { position: absolute; inset: 0; padding: 0.5rem; font-family: 'Special Gothic Expanded One', sans-serif; font-weight: 400; font-size: 4.12rem; color: #000; text-transform: uppercase; text-align: justify; line-height: 0.9; word-break: break-all; transition: opacity 0.5s ease; }",
-        ".card:hover .overlay-all .mask-text { opacity: 0 }",
-        ".header-bar { position: relative; padding: 2rem; color: #fff; display: flex; flex-direction: column; justify-content: center; }",
-        ".header-bar .title { font-family: 'Libre Bodoni', serif; font-style: italic; font-size: 28px; margin: 0; }",
-        ".header-bar .timestamp { font-family: 'Libre Bodoni', serif; font-style: italic; font-size: 16px; margin: 0; }",
-        ".media-block img { mix-blend-mode: lighten; }",
-        ".badge { position: absolute; top: 4.5rem; right: -1.5rem; z-index: 10; background: #e63946; color: #fff; border-radius: 50%; width: 5rem; height: 5rem; display: flex; align-items: center; justify-content: center; font-size: 1.8rem; font-weight: bold; }",
-        ".toc { position: fixed; top: 1rem; left: 1rem; max-width: 200px; }",
-        ".toc strong { display: block; margin-bottom: 0.5rem; }",
-        ".toc ul { list-style: none; padding: 0; margin: 0; }",
-        ".toc li { margin-bottom: 0.5rem; }",
-        ".main { margin-left: 220px; }",
-        "@media (max-width: 768px) {",
-        "  .toc { position: static; margin: 0 0 1rem; max-width: none; }",
-        "  .main { margin-left: 0; }",
-        "  .overlay-all .mask-text { font-size: 2rem; }",
-        "  .badge { position: relative; top: auto; right: auto; margin-left: 0.5rem; }",
-        "}",
-        "@media (max-width: 768px) {",
-        "  .toc { position: static; margin-bottom: 1rem; max-width: none; }",
-        "  .main { margin-left: 0; }",
-        "  .overlay-all .mask-text { font-size: 2.5rem; }",
-        "  .badge { position: relative; top: auto; right: auto; margin-left: 0.5rem; }",
-        "}" ,
-        ".station h2 { margin-bottom: 0.25rem; }",
-        ".station h2 + hr { margin: 0 auto 1rem; border: none; border-top: 1px solid #ccc; }",
-        ".footer { text-align: center; margin-top: 2rem; font-size: 0.9rem; color: #555555; }",
-        "</style></head><body>",
-        "<div class='toc'><strong>Stations</strong><ul>",
+        pls.sort(key=by_last_updated, reverse=True)
+    # station names go into both text and attributes, so escape them up front
+    sections = [
+        (station.translate(HTML_ESCAPE), pls)
+        for station, pls in sorted(stations.items(), key=itemgetter(0))
     ]
-    for station in sorted(stations):
-        html.append(f"<li><a href='#{station}'>{station}</a></li>")
-    html.append("</ul></div>")
-    html.append("<div class='main'>")
-
-    for station in sorted(stations):
-        html.append(f'<div class="station" id="{station}"><h2>{station}</h2><hr/>')
-        html.append('<ul class="playlist-list">')
-        # ensure playlists sorted by last_updated descending
-        for p in sorted(
-            stations[station], key=lambda p: p.get("last_updated", ""), reverse=True
-        ):
-            html.append(f"<li><a class='card' href='{p['url']}'>")
-            # Build side-by-side artist list + preview grid
-            html.append('<div class="media-block">')
-            # wrap both images and text in a dark blending container
-            artist_set = []
-            # collect unique artist names first
-            for t in p.get("preview", [])[:12]:
-                for art in t.get("artists", []):
-                    if art not in artist_set:
-                        artist_set.append(art)
-            # join artists with a random symbol between each name
-            symbols = [
-                '◆', '◇', '•', '×', '/', '\\', '✦', '✧', '✵', '✶', '✹', '✺',
-                '✿', '❖', '❂', '❄', '❈', '❉', '❋', '◈', '▫', '▱',
-                '✢', '✣', '✤', '✥', '✦', '✧', '★', '☆', '☉', '☾', '☽'
-            ]
-            txt = ''
-            if artist_set:
-                txt = artist_set[0]
-                for art in artist_set[1:]:
-                    sep = random.choice(symbols)
-                    txt += f" {sep} {art}"
-            # choose a theme color from a fixed palette based on playlist name
-            palette = [
-                '#896241ff',  # raw-umber
-                '#422A19ff',  # bistre
-                '#88B1D4ff',  # carolina-blue
-                '#A9C8D8ff',  # columbia-blue
-                '#5A7ACFff',  # glaucous
-            ]
-            # stable selection via MD5 of playlist name
-            import hashlib
-            name_hash = hashlib.md5(p['name'].encode('utf-8')).hexdigest()
-            idx = int(name_hash[:8], 16) % len(palette)
-            color = palette[idx]
-            # header bar for title + timestamp (above masked grid)
-            last_up = p.get('last_updated', '')
-            html.append(f"<div class='header-bar' style='background:{color}'>")
-            html.append(f"<div class='badge'>{p.get('track_count',0)}</div>")
-            html.append(f"<div class='title'>{p['name']}</div>")
-            html.append(f"<div class='timestamp'>Last Updated {last_up}</div>")
-            html.append("</div>")
-            html.append("<div class='overlay-all'>")
-            # overlay with artists only (title removed)
-            html.append(f"<div class='mask-text'>{txt}</div>")
-            html.append('<div class="preview-grid">')
-            for t in p.get("preview", [])[:12]:
-                img = t.get("image_url")
-                if img:
-                    html.append(f"<img src='{img}' alt='{t.get('name','')}'/>")
-            html.append("</div>")
-            # sticker showing track count
-            html.append("</div>")
-            html.append("</a></li>")
-    html.append("</ul></div>")
 
-    # close main content and add overall timestamp footer
-    html.append("</div>")
-    html.append(f"<div class='footer'>Updated: {ts} · Total Playlists: {count}</div>")
-    html.append("</body></html>")
-    os.makedirs(os.path.dirname("docs/index.html"), exist_ok=True)
-    with open("docs/index.html", "w") as f:
-        f.write("\n".join(html))
+    if not os.path.isdir(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # stream the fragments straight into a large write buffer instead of joining
+    # them into one string first; the text layer encodes whole buffers at a time.
+    # Written beside the target and renamed over it so a failed run never leaves
+    # a half-written page behind.
+    tmp_path = OUTPUT_PATH + ".tmp"
+    try:
+        with open(
+            tmp_path, "w", encoding="utf-8", newline="\n", buffering=1 << 20
+        ) as f:
+            for line in render_page(sections, ts, count):
+                f.write(line)
+                f.write("\n")
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, OUTPUT_PATH)
 
 
 if __name__ == "__main__":
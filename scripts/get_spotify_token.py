@@ -5,23 +5,25 @@ Run this once to get your refresh token, then use it in the Rust app.
 """
 
 import base64
+import http.client
 import json
 import urllib.parse
-import urllib.request
 import webbrowser
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import threading
 import os
-import time
 
 # Configuration
 CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 REDIRECT_URI = "http://127.0.0.1:8888/callback"
+TOKEN_HOST = "accounts.spotify.com"
 SCOPE = "playlist-modify-public playlist-modify-private playlist-read-private"
 
 # Global variable to store the authorization code
 auth_code = None
+# Set by the callback handler once the authorization code has arrived
+AUTH_EVENT = threading.Event()
 
 class CallbackHandler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -33,6 +35,7 @@ class CallbackHandler(BaseHTTPRequestHandler):
             
             if 'code' in params:
                 auth_code = params['code'][0]
+                AUTH_EVENT.set()
                 self.send_response(200)
                 self.send_header('Content-type', 'text/html')
                 self.end_headers()
@@ -50,6 +53,24 @@ class CallbackHandler(BaseHTTPRequestHandler):
         # Suppress default logging
         pass
 
+def preconnect(conn):
+    """Open the TLS connection to the token endpoint while the user authorizes"""
+    try:
+        conn.connect()
+    except OSError:
+        # request() will connect again on its own
+        pass
+
+def post_token_request(conn, body, headers):
+    """POST to the token endpoint, reconnecting once if the idle connection was dropped"""
+    try:
+        conn.request('POST', '/api/token', body=body, headers=headers)
+        return conn.getresponse()
+    except (http.client.RemoteDisconnected, ConnectionError):
+        conn.close()
+        conn.request('POST', '/api/token', body=body, headers=headers)
+        return conn.getresponse()
+
 def get_refresh_token():
     # Step 1: Start local server for callback
     server = HTTPServer(('localhost', 8888), CallbackHandler)
@@ -71,20 +92,24 @@ def get_refresh_token():
     print(f"\n1. Opening browser to authorize the application...")
     print(f"   If it doesn't open automatically, visit: {auth_url}")
     
+    # Do the TLS handshake for the token exchange while we wait for the user
+    token_conn = http.client.HTTPSConnection(TOKEN_HOST, timeout=30)
+    preconnect_thread = threading.Thread(target=preconnect, args=(token_conn,))
+    preconnect_thread.daemon = True
+    preconnect_thread.start()
+    
     webbrowser.open(auth_url)
     
     # Step 3: Wait for callback
     print("2. Waiting for authorization callback...")
     timeout = 60  # 60 seconds timeout
-    start_time = time.time()
-    
-    while auth_code is None and (time.time() - start_time) < timeout:
-        time.sleep(0.1)
+    AUTH_EVENT.wait(timeout=timeout)
     
     server.shutdown()
     
     if auth_code is None:
         print("❌ Timeout waiting for authorization. Please try again.")
+        token_conn.close()
         return None
     
     print("3. Authorization code received! Exchanging for tokens...")
@@ -98,18 +123,17 @@ def get_refresh_token():
     
     credentials = base64.b64encode(f"{CLIENT_ID}:{CLIENT_SECRET}".encode()).decode()
     
-    req = urllib.request.Request(
-        'https://accounts.spotify.com/api/token',
-        data=urllib.parse.urlencode(token_data).encode(),
-        headers={
-            'Authorization': f'Basic {credentials}',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-    )
+    headers = {
+        'Authorization': f'Basic {credentials}',
+        'Content-Type': 'application/x-www-form-urlencoded'
+    }
+    
+    preconnect_thread.join()
     
     try:
-        with urllib.request.urlopen(req) as response:
-            token_response = json.loads(response.read().decode())
+        response = post_token_request(token_conn, urllib.parse.urlencode(token_data), headers)
+        token_response = json.loads(response.read())
+        token_conn.close()
             
         if 'refresh_token' in token_response:
             print("✅ Success! Here are your tokens:")
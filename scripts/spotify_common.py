@@ -0,0 +1,338 @@
+"""
+Spotify helpers shared by the playlist cleanup scripts: authentication,
+playlist listing (with a short-lived cache both scripts reuse) and deletion.
+"""
+
+import os
+import requests
+import base64
+import hashlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Same optional orjson fallback as generate_static_html.py
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# tqdm gives a single redraw-throttled progress line; optional
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Number of concurrent DELETE requests against the Spotify API
+MAX_WORKERS = 8
+MAX_RETRIES = 5
+PAGE_SIZE = 50
+PROGRESS_INTERVAL = 25
+
+# Access tokens are valid for an hour, so reuse them across script runs
+TOKEN_CACHE_PATH = os.path.expanduser('~/.cache/spinitron_spotify_token.json')
+
+# Both cleanup scripts share one playlist listing when run back to back
+PLAYLIST_CACHE_DIR = os.path.expanduser('~/.cache')
+PLAYLIST_CACHE_TTL = 60
+
+# Guards against concurrent refreshes when the token expires mid-run
+_token_lock = threading.Lock()
+_token_in_flight = None
+
+# Shared by the worker threads so HTTPS connections get reused
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+))
+
+# With httpx + h2 installed, the concurrent DELETEs are multiplexed over a single
+# HTTP/2 connection instead of one HTTP/1.1 connection per worker
+try:
+    import httpx
+    DELETE_CLIENT = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=1, max_keepalive_connections=1),
+        timeout=30.0,
+    )
+    DELETE_ERRORS = (requests.RequestException, httpx.HTTPError)
+except ImportError:
+    DELETE_CLIENT = SESSION
+    DELETE_ERRORS = (requests.RequestException,)
+
+def load_cached_token(fingerprint):
+    """Return the cached access token if it is still valid"""
+    try:
+        with open(TOKEN_CACHE_PATH) as f:
+            cached = json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+    
+    if cached.get('fingerprint') != fingerprint:
+        return None
+    if time.time() >= cached.get('expires_at', 0) - 60:
+        return None
+    
+    return cached.get('access_token')
+
+def save_cached_token(fingerprint, access_token, expires_in):
+    """Atomically write the access token to the cache file (owner-only permissions)"""
+    tmp_path = f"{TOKEN_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(TOKEN_CACHE_PATH), exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({
+                'fingerprint': fingerprint,
+                'access_token': access_token,
+                'expires_at': time.time() + expires_in
+            }, f)
+        os.replace(tmp_path, TOKEN_CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️  Could not cache access token: {e}")
+
+def get_access_token():
+    """Get access token using refresh token"""
+    global _token_in_flight
+    
+    client_id = os.environ.get('SPOTIFY_CLIENT_ID')
+    client_secret = os.environ.get('SPOTIFY_CLIENT_SECRET') 
+    refresh_token = os.environ.get('SPOTIFY_REFRESH_TOKEN')
+    
+    if not all([client_id, client_secret, refresh_token]):
+        print("❌ Missing environment variables:")
+        print("   SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_REFRESH_TOKEN")
+        sys.exit(1)
+    
+    fingerprint = hashlib.sha256(f"{client_id}:{refresh_token}".encode()).hexdigest()
+    
+    # Only one thread performs the refresh; the others wait on its result
+    with _token_lock:
+        cached_token = load_cached_token(fingerprint)
+        if cached_token:
+            return cached_token
+        
+        in_flight = _token_in_flight
+        if in_flight is None:
+            in_flight = _token_in_flight = Future()
+            is_owner = True
+        else:
+            is_owner = False
+    
+    if not is_owner:
+        return in_flight.result()
+    
+    try:
+        access_token = refresh_access_token(client_id, client_secret, refresh_token, fingerprint)
+        in_flight.set_result(access_token)
+        return access_token
+    except BaseException as e:
+        in_flight.set_exception(e)
+        raise
+    finally:
+        with _token_lock:
+            _token_in_flight = None
+
+def refresh_access_token(client_id, client_secret, refresh_token, fingerprint):
+    """Exchange the refresh token for a new access token and cache it"""
+    # Encode credentials
+    credentials = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+    
+    # Request access token
+    response = SESSION.post(
+        'https://accounts.spotify.com/api/token',
+        headers={'Authorization': f'Basic {credentials}'},
+        data={
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token
+        }
+    )
+    
+    if response.status_code != 200:
+        print(f"❌ Failed to get access token: {response.text}")
+        sys.exit(1)
+    
+    token_data = json_loads(response.content)
+    save_cached_token(fingerprint, token_data['access_token'], token_data['expires_in'])
+    
+    return token_data['access_token']
+
+def slim_playlist(item):
+    """Keep only the playlist fields the cleanup needs"""
+    return {
+        'id': item['id'],
+        'name': item['name'],
+        # always strings, so callers can sort and search without None checks
+        'description': item.get('description') or '',
+        'snapshot_id': item.get('snapshot_id') or '',
+        'tracks': {'total': item['tracks']['total']}
+    }
+
+def get_playlist_page(access_token, offset):
+    """Get one page of the user's playlists, or None on failure"""
+    response = SESSION.get(
+        'https://api.spotify.com/v1/me/playlists',
+        headers={'Authorization': f'Bearer {access_token}'},
+        params={'limit': PAGE_SIZE, 'offset': offset}
+    )
+    if response.status_code != 200:
+        print(f"❌ Failed to get playlists: {response.text}")
+        return None
+    
+    # /me/playlists has no `fields` filter, so drop the unused fields (owner,
+    # images, urls...) right away instead of holding every full object
+    data = json_loads(response.content)
+    data['items'] = [slim_playlist(item) for item in data['items']]
+    return data
+
+def playlist_cache_path():
+    """Per-account path of the playlist listing shared by the cleanup scripts"""
+    refresh_token = os.environ.get('SPOTIFY_REFRESH_TOKEN', '')
+    account = hashlib.sha256(refresh_token.encode()).hexdigest()[:16]
+    return os.path.join(PLAYLIST_CACHE_DIR, f'spinitron_playlists_{account}.json')
+
+def load_cached_playlists():
+    """Return the playlist listing saved by a run in the last PLAYLIST_CACHE_TTL seconds"""
+    path = playlist_cache_path()
+    try:
+        if time.time() - os.path.getmtime(path) > PLAYLIST_CACHE_TTL:
+            return None
+        with open(path, 'rb') as f:
+            return json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+def save_cached_playlists(playlists):
+    """Atomically write the playlist listing for the other cleanup script to reuse"""
+    path = playlist_cache_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(PLAYLIST_CACHE_DIR, exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(playlists, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  Could not cache playlist listing: {e}")
+
+def invalidate_cached_playlists():
+    """Drop the cached listing once playlists have been deleted"""
+    try:
+        os.remove(playlist_cache_path())
+    except FileNotFoundError:
+        pass
+
+def fetch_all_playlists(access_token):
+    """Get all of the user's playlists (cached briefly), or None if a page failed"""
+    cached = load_cached_playlists()
+    if cached is not None:
+        print(f"   (using the playlist list fetched in the last {PLAYLIST_CACHE_TTL}s)")
+        return cached
+    
+    first_page = get_playlist_page(access_token, 0)
+    if first_page is None:
+        return None
+    
+    # The first page reports the total, so the remaining pages can be fetched in parallel
+    offsets = range(PAGE_SIZE, first_page['total'], PAGE_SIZE)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        pages = list(executor.map(lambda offset: get_playlist_page(access_token, offset), offsets))
+    
+    if any(page is None for page in pages):
+        return None
+    
+    playlists = list(first_page['items'])
+    for page in pages:
+        playlists.extend(page['items'])
+    
+    save_cached_playlists(playlists)
+    return playlists
+
+def delete_with_retry(url, headers):
+    """Send a DELETE request, waiting out Spotify rate limits (HTTP 429)"""
+    response = DELETE_CLIENT.delete(url, headers=headers)
+    # SESSION's urllib3 Retry already honours Retry-After on 429s, so only the
+    # httpx client needs this loop; retrying on top of it would multiply attempts
+    retries = 0 if DELETE_CLIENT is SESSION else MAX_RETRIES
+    for _ in range(retries):
+        if response.status_code != 429:
+            break
+        time.sleep(int(response.headers.get('Retry-After', 1)))
+        response = DELETE_CLIENT.delete(url, headers=headers)
+    return response
+
+def delete_playlist(access_token, playlist_id):
+    """Delete a playlist by unfollowing it"""
+    headers = {'Authorization': f'Bearer {access_token}'}
+    
+    # A dropped connection or timeout (or a malformed Retry-After) counts as one
+    # failed deletion instead of aborting the whole run
+    try:
+        response = delete_with_retry(
+            f'https://api.spotify.com/v1/playlists/{playlist_id}/followers',
+            headers
+        )
+    except DELETE_ERRORS + (ValueError,):
+        return False
+    
+    return response.status_code == 200
+
+def track_progress(futures):
+    """Yield futures as they complete, reporting progress on one line (tqdm) or periodically"""
+    completed = as_completed(futures)
+    if tqdm is not None:
+        yield from tqdm(completed, total=len(futures), unit='playlist')
+        return
+    
+    for done, future in enumerate(completed, 1):
+        if done % PROGRESS_INTERVAL == 0 or done == len(futures):
+            print(f"   {done}/{len(futures)} done")
+        yield future
+
+def delete_playlists(access_token, playlists):
+    """Delete playlists concurrently; return (deleted count, list of failed playlists)"""
+    deleted_count = 0
+    failed = []
+    
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(delete_playlist, access_token, playlist['id']): playlist
+                for playlist in playlists
+            }
+            
+            try:
+                for future in track_progress(futures):
+                    if future.result():
+                        deleted_count += 1
+                    else:
+                        failed.append(futures[future])
+            except BaseException:
+                # Leaving the with-block would wait for every queued DELETE to go
+                # out, so on Ctrl-C (or any error) drop the queue and only let the
+                # requests already in flight finish
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor.shutdown(wait=True)
+                finished = sum(
+                    1 for f in futures
+                    if not f.cancelled() and f.exception() is None and f.result()
+                )
+                cancelled = sum(1 for f in futures if f.cancelled())
+                print(f"\n⛔ Stopped: {finished} playlists deleted, {cancelled} deletions cancelled")
+                raise
+    finally:
+        # The listing no longer matches what's on Spotify, even after a partial run
+        invalidate_cached_playlists()
+    
+    return deleted_count, failed
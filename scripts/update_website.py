@@ -4,41 +4,64 @@ Script to update the GitHub Pages website with fresh playlist data
 Used by GitHub Actions and can be run locally for testing
 """
 
+import shutil
 import subprocess
 import sys
 import os
 
 
 def run_command(cmd):
-    """Run shell command and return output"""
+    """Run a command (argv list, no shell) and return output"""
     try:
-        result = subprocess.run(
-            cmd, shell=True, capture_output=True, text=True, check=True
-        )
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
         return result.stdout
     except subprocess.CalledProcessError as e:
-        print(f"❌ Error running command: {cmd}")
+        print(f"❌ Error running command: {' '.join(cmd)}")
         print(f"   {e.stderr}")
         sys.exit(1)
 
 
-def main():
-    print("🌐 Updating website with latest playlists...")
-
-    if not os.path.exists("./target/release/spinitron-scraper"):
-        print("❌ Error: ./target/release/spinitron-scraper not found")
+def stream_command(cmd, path):
+    """Run a command and stream its stdout straight into a file"""
+    # stderr is left attached to ours so scraper diagnostics show up as they happen.
+    # Output goes to a temporary file that only replaces the previous one once the
+    # command succeeds, so a failed or missing scraper leaves the old data in place.
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    except OSError as e:
+        # missing, not executable, wrong architecture...
+        print(f"❌ Error: could not run {cmd[0]}: {e.strerror or e}")
         print("   Run 'cargo build --release' first")
         sys.exit(1)
+    tmp_path = path + ".tmp"
+    try:
+        with proc, open(tmp_path, "wb") as out:
+            shutil.copyfileobj(proc.stdout, out, 1 << 20)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if proc.returncode != 0:
+        os.remove(tmp_path)
+        print(f"❌ Error running command: {' '.join(cmd)}")
+        print(f"   exited with status {proc.returncode}")
+        sys.exit(1)
+    os.replace(tmp_path, path)
+
+
+def main():
+    print("🌐 Updating website with latest playlists...")
 
     print("📊 Generating fresh playlist data...")
-    raw = run_command("./target/release/spinitron-scraper --list-playlists")
     os.makedirs("docs", exist_ok=True)
-    with open("docs/playlists.jsonl", "w") as jf:
-        jf.write(raw)
+    stream_command(
+        ["./target/release/spinitron-scraper", "--list-playlists"],
+        "docs/playlists.jsonl",
+    )
 
     print("📄 Generating static HTML...")
     run_command(
-        "python3 scripts/generate_static_html.py docs/playlists.jsonl"
+        ["python3", "scripts/generate_static_html.py", "docs/playlists.jsonl"]
     )
 
     print("✅ Website update complete!")